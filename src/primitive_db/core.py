@@ -1,12 +1,50 @@
 # src/primitive_db/core.py
+import sys
+
 from .decorators import cacher, confirm_action, handle_db_errors, log_time
-from .utils import load_table_data, save_table_data
+from .partitions import (
+    PARTITION_METHODS,
+    get_partition_spec,
+    load_table,
+    partition_key,
+    remove_partitions,
+    storage_name,
+)
+from .stats import (
+    collect_statistics,
+    empty_statistics,
+    record_delete,
+    record_insert,
+    record_update,
+)
+from .utils import (
+    append_table_changes,
+    load_table_data,
+    remove_table_data,
+    save_table_data,
+)
+
+
+def _row_matches(row, where_clause):
+    """
+    Проверяет, удовлетворяет ли запись условию WHERE.
+    """
+    if not where_clause:
+        return True
+    for key, value in where_clause.items():
+        if row.get(key) != value:
+            return False
+    return True
 
 
 @handle_db_errors
-def create_table(metadata, table_name, columns):
+def create_table(metadata, table_name, columns, partition=None, compress=False):
     """
     Создает новую таблицу в метаданных.
+    
+    Если передано описание секционирования partition, каждая секция
+    таблицы хранится в отдельном файле data/<таблица>/<секция>.json.
+    С compress=True файлы таблицы (и ее секций) сжимаются zlib.
     """
     # Проверяем, существует ли уже таблица с таким именем
     if "tables" in metadata and table_name in metadata["tables"]:
@@ -28,6 +66,25 @@ def create_table(metadata, table_name, columns):
     # Добавляем столбец ID:int в начало списка столбцов
     columns_with_id = [("ID", "int")] + columns
     
+    # Проверяем описание секционирования
+    if partition is not None:
+        column_types = dict(columns_with_id)
+        if partition["column"] not in column_types:
+            print(
+                f"Ошибка: Столбец секционирования '{partition['column']}' "
+                "не найден"
+            )
+            return metadata
+        if partition["method"] not in PARTITION_METHODS:
+            print(f"Ошибка: Неизвестный метод секционирования '{partition['method']}'")
+            return metadata
+        if (
+            partition["method"] == "range"
+            and column_types[partition["column"]] != "int"
+        ):
+            print("Ошибка: Секционирование range возможно только по столбцу int")
+            return metadata
+    
     # Инициализируем структуру таблицы в метаданных
     if "tables" not in metadata:
         metadata["tables"] = {}
@@ -35,14 +92,23 @@ def create_table(metadata, table_name, columns):
     # Создаем запись о таблице
     metadata["tables"][table_name] = {
         "columns": columns_with_id,
-        "data": []
+        "data": [],
+        "stats": empty_statistics(columns_with_id),
+        "compress": compress,
     }
     
-    # Создаем файл для данных таблицы
-    save_table_data(table_name, [])
+    if partition is not None:
+        # Файлы секций создаются по мере вставки записей
+        metadata["tables"][table_name]["partition"] = partition
+        metadata["tables"][table_name]["last_id"] = 0
+    else:
+        # Создаем файл для данных таблицы
+        save_table_data(table_name, [], compress)
     
     print(f"Таблица '{table_name}' успешно создана")
     print(f"Столбцы: {[col[0] for col in columns_with_id]}")
+    if partition is not None:
+        print(f"Секционирование: {partition['method']} по '{partition['column']}'")
     
     return metadata
 
@@ -59,13 +125,14 @@ def drop_table(metadata, table_name):
         return metadata
     
     # Удаляем таблицу из метаданных
+    partition = get_partition_spec(metadata, table_name)
     del metadata["tables"][table_name]
     
-    # Удаляем файл с данными таблицы (если существует)
-    import os
-    filepath = f"data/{table_name}.json"
-    if os.path.exists(filepath):
-        os.remove(filepath)
+    # Удаляем файлы с данными таблицы (если существуют)
+    if partition is not None:
+        remove_partitions(table_name)
+    else:
+        remove_table_data(table_name)
     
     print(f"Таблица '{table_name}' успешно удалена")
     
@@ -98,11 +165,16 @@ def insert(metadata, table_name, values):
         )
         return []
     
-    # Загружаем текущие данные таблицы
-    table_data = load_table_data(table_name)
+    partition = table_info.get("partition")
+    
+    # Загружаем текущие данные таблицы; секционированные таблицы
+    # хранят последний выданный ID в метаданных и не читаются целиком
+    table_data = [] if partition is not None else load_table_data(table_name)
     
     # Генерируем новый ID
-    if table_data:
+    if partition is not None:
+        new_id = table_info["last_id"] + 1
+    elif table_data:
         new_id = max(row["ID"] for row in table_data) + 1
     else:
         new_id = 1
@@ -125,9 +197,19 @@ def insert(metadata, table_name, values):
         
         new_row[col_name] = validated_value
     
-    # Добавляем запись и сохраняем
+    # Добавляем запись и сохраняем; счетчик ID меняется только
+    # после успешной записи в журнал секции
     table_data.append(new_row)
-    save_table_data(table_name, table_data)
+    if partition is not None:
+        append_table_changes(
+            storage_name(metadata, table_name, new_row),
+            [{"op": "insert", "row": new_row}],
+            table_info.get("compress", False),
+        )
+        table_info["last_id"] = new_id
+    else:
+        save_table_data(table_name, table_data, table_info.get("compress", False))
+    record_insert(table_info, new_row)
     
     print(f"Запись успешно добавлена в таблицу '{table_name}' (ID: {new_id})")
     return table_data
@@ -142,6 +224,13 @@ def select(table_data, where_clause=None):
     if where_clause is None:
         return table_data
     
+    # Интернируем строки условия: значения закодированных столбцов тоже
+    # интернированы, и сравнение сводится к проверке идентичности объектов
+    where_clause = {
+        key: sys.intern(value) if isinstance(value, str) else value
+        for key, value in where_clause.items()
+    }
+    
     # Создаем ключ для кэша на основе данных и условия
     cache_key = (
         "select_" 
@@ -152,69 +241,179 @@ def select(table_data, where_clause=None):
     
     # Используем кэширование
     def perform_select():
-        filtered_data = []
-        for row in table_data:
-            match = True
-            for key, value in where_clause.items():
-                if row.get(key) != value:
-                    match = False
-                    break
-            if match:
-                filtered_data.append(row)
-        return filtered_data
+        return [row for row in table_data if _row_matches(row, where_clause)]
     
     return cacher(cache_key, perform_select)
 
 
+def _append_grouped_changes(changes, compress=False):
+    """
+    Дописывает изменения в журналы, сгруппированные по хранилищам.
+    """
+    for name, storage_changes in changes.items():
+        append_table_changes(name, storage_changes, compress)
+
+
 @handle_db_errors
-def update(table_data, set_clause, where_clause):
+def update(metadata, table_name, table_data, set_clause, where_clause):
     """
     Обновляет записи в данных таблицы.
+    
+    Изменяются только совпавшие записи, а на диск дописываются
+    патчи по их ID, без перезаписи всего файла таблицы. Если меняется
+    ключ секционирования, запись переносится в другую секцию.
     """
+    # Проверяем существование таблицы
+    if "tables" not in metadata or table_name not in metadata["tables"]:
+        print(f"Ошибка: Таблица '{table_name}' не существует")
+        return metadata
+    
+    # Новое значение ключа секционирования должно попадать в какую-то секцию
+    spec = get_partition_spec(metadata, table_name)
+    if (
+        spec is not None
+        and spec["column"] in set_clause
+        and partition_key(spec, set_clause[spec["column"]]) is None
+    ):
+        print(
+            f"Ошибка: Значение '{set_clause[spec['column']]}' не подходит "
+            f"для столбца секционирования '{spec['column']}'"
+        )
+        return metadata
+    
+    table_info = metadata["tables"][table_name]
     updated_count = 0
+    patches = []
+    inserts = {}
+    changes = {}
     
+    # Сначала только готовим изменения: данные в памяти и статистика
+    # меняются после того, как все записи в журналы прошли успешно
     for row in table_data:
-        match = True
-        for key, value in where_clause.items():
-            if row.get(key) != value:
-                match = False
-                break
+        if not _row_matches(row, where_clause):
+            continue
         
-        if match:
-            for key, value in set_clause.items():
-                if key in row and key != "ID":  # ID нельзя обновлять
-                    row[key] = value
-            updated_count += 1
+        # ID нельзя обновлять; в патч попадают только реально измененные поля
+        patch = {
+            key: value
+            for key, value in set_clause.items()
+            if key in row and key != "ID" and row[key] != value
+        }
+        if patch:
+            updated_row = {**row, **patch}
+            old_storage = storage_name(metadata, table_name, row)
+            new_storage = storage_name(metadata, table_name, updated_row)
+            if old_storage == new_storage:
+                changes.setdefault(old_storage, []).append(
+                    {"op": "update", "ID": row["ID"], "set": patch}
+                )
+            else:
+                inserts.setdefault(new_storage, []).append(
+                    {"op": "insert", "row": updated_row}
+                )
+                changes.setdefault(old_storage, []).append(
+                    {"op": "delete", "ID": row["ID"]}
+                )
+            patches.append((row, patch))
+        updated_count += 1
+    
+    # Перенос между секциями: сначала вставка в новую секцию, потом
+    # удаление из старой. При сбое между ними запись не теряется, а
+    # повторное применение вставки безопасно
+    compress = table_info.get("compress", False)
+    _append_grouped_changes(inserts, compress)
+    _append_grouped_changes(changes, compress)
+    
+    # Статистика меняется только после успешной записи, иначе план
+    # empty мог бы довериться ей и не найти существующие записи
+    for row, patch in patches:
+        record_update(table_info, {key: row[key] for key in patch}, patch)
+        row.update(patch)
     
     print(f"Обновлено записей: {updated_count}")
-    return table_data
+    return metadata
 
 
 @handle_db_errors
 @confirm_action("удаление записей")
-def delete(table_data, where_clause):
+def delete(metadata, table_name, table_data, where_clause):
     """
     Удаляет записи из данных таблицы.
+    
+    Записи удаляются из списка на месте, а на диск дописываются
+    отметки об удалении по ID. Секция, из которой удалены все
+    записи, удаляется вместе с файлом. table_data должна содержать
+    загруженные секции целиком (см. partitions.load_table).
     """
+    # Проверяем существование таблицы
+    if "tables" not in metadata or table_name not in metadata["tables"]:
+        print(f"Ошибка: Таблица '{table_name}' не существует")
+        return metadata
+    
     if where_clause is None:
         print("Ошибка: Для удаления необходимо указать условие WHERE")
-        return table_data
+        return metadata
     
-    initial_count = len(table_data)
+    table_info = metadata["tables"][table_name]
     
-    # Фильтруем данные, исключая записи, соответствующие условию
-    filtered_data = []
+    # Сначала только готовим изменения: список в памяти меняется
+    # после того, как все записи на диск прошли успешно
+    changes = {}
+    kept_storages = set()
+    deleted_rows = []
     for row in table_data:
-        match = True
-        for key, value in where_clause.items():
-            if row.get(key) != value:
-                match = False
-                break
-        
-        if not match:
-            filtered_data.append(row)
+        name = storage_name(metadata, table_name, row)
+        if _row_matches(row, where_clause):
+            changes.setdefault(name, []).append({"op": "delete", "ID": row["ID"]})
+            deleted_rows.append(row)
+        else:
+            # Имена без учета регистра: на Windows и macOS имена файлов,
+            # отличающиеся только регистром, указывают на один файл
+            kept_storages.add(name.casefold())
+    
+    # Опустевшие секции удаляются целиком вместо записи отметок об удалении
+    for name in list(changes):
+        if name != table_name and name.casefold() not in kept_storages:
+            remove_table_data(name)
+            del changes[name]
+    
+    _append_grouped_changes(changes, table_info.get("compress", False))
+    
+    # Сдвигаем оставшиеся записи к началу списка, не создавая копию
+    # Статистика меняется только после успешной записи
+    for row in deleted_rows:
+        record_delete(table_info, row)
+    
+    deleted_ids = {row["ID"] for row in deleted_rows}
+    kept = 0
+    for row in table_data:
+        if row["ID"] not in deleted_ids:
+            table_data[kept] = row
+            kept += 1
+    del table_data[kept:]
+    deleted_count = len(deleted_rows)
     
-    deleted_count = initial_count - len(filtered_data)
     print(f"Удалено записей: {deleted_count}")
+    return metadata
+
+
+@handle_db_errors
+@log_time
+def analyze_table(metadata, table_name):
+    """
+    Пересчитывает статистику столбцов таблицы полным проходом по данным.
+    """
+    # Проверяем существование таблицы
+    if "tables" not in metadata or table_name not in metadata["tables"]:
+        print(f"Ошибка: Таблица '{table_name}' не существует")
+        return metadata
     
-    return filtered_data
\ No newline at end of file
+    table_info = metadata["tables"][table_name]
+    table_data = load_table(metadata, table_name)
+    table_info["stats"] = collect_statistics(table_data, table_info["columns"])
+    
+    print(
+        f"Статистика таблицы '{table_name}' обновлена "
+        f"(записей: {table_info['stats']['row_count']})"
+    )
+    return metadata
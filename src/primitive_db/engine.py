@@ -3,10 +3,28 @@ import shlex
 
 from prettytable import PrettyTable
 
-from .core import create_table, delete, drop_table, insert, select, update
+from .core import (
+    analyze_table,
+    create_table,
+    delete,
+    drop_table,
+    insert,
+    select,
+    update,
+)
 from .decorators import handle_db_errors
-from .parser import parse_set_clause, parse_where_condition
-from .utils import load_metadata, load_table_data, save_metadata, save_table_data
+from .parser import parse_partition_clause, parse_set_clause, parse_where_condition
+from .partitions import load_table
+from .planner import choose_access_path, load_table_for_query
+from .snapshots import (
+    create_snapshot,
+    list_snapshots,
+    load_snapshot_metadata,
+    recover_restore,
+    restore_snapshot,
+    snapshot_data_dir,
+)
+from .utils import load_metadata, save_metadata
 
 
 def print_help():
@@ -14,15 +32,30 @@ def print_help():
     print("\n***Процесс работы с таблицей***")
     print("Функции управления таблицами:")
     print("  create_table <имя_таблицы> <столбец1:тип> .. - создать таблицу")
+    print(
+        "    [partition by <столбец> [hash <N> | range <шаг>]] "
+        "- хранить таблицу по секциям"
+    )
+    print("    [compress] - сжимать файлы таблицы zlib")
     print("  list_tables - показать список всех таблиц")
     print("  drop_table <имя_таблицы> - удалить таблицу")
     
     print("\nCRUD операции:")
     print("  insert <таблица> <значение1> <значение2> ... - добавить запись")
     print("  select <таблица> [where поле=значение] - выбрать записи")
+    print("    [snapshot <имя>] - читать данные из снимка")
     print("  update <таблица> set поле=значение [where поле=значение] - обновить")
     print("  delete <таблица> where поле=значение - удалить записи")
     
+    print("\nСтатистика и планы запросов:")
+    print("  analyze <таблица> - пересчитать статистику столбцов")
+    print("  explain <таблица> [where поле=значение] - показать план чтения")
+    
+    print("\nСнимки:")
+    print("  snapshot <имя> - сохранить снимок базы данных")
+    print("  restore <имя> - восстановить базу данных из снимка")
+    print("  list_snapshots - показать список снимков")
+    
     print("\nОбщие команды:")
     print("  exit - выход из программы")
     print("  help - справочная информация\n")
@@ -37,7 +70,13 @@ def list_tables(metadata):
     print("\nСписок таблиц:")
     for table_name, table_info in metadata["tables"].items():
         columns = [f"{col[0]}:{col[1]}" for col in table_info["columns"]]
-        print(f"  {table_name}: {', '.join(columns)}")
+        line = f"  {table_name}: {', '.join(columns)}"
+        partition = table_info.get("partition")
+        if partition:
+            line += f" (partition by {partition['column']} {partition['method']})"
+        if table_info.get("compress"):
+            line += " (compress)"
+        print(line)
 
 
 def print_table_data(table_data, columns):
@@ -60,6 +99,9 @@ def run():
     print("Добро пожаловать в примитивную базу данных!")
     print_help()
     
+    # Завершаем восстановление из снимка, если его прервал сбой
+    recover_restore()
+    
     while True:
         # Загружаем актуальные метаданные
         metadata = load_metadata("database.json")
@@ -84,17 +126,42 @@ def run():
                 print_help()
                 
             elif command == "create_table":
+                usage = (
+                    "Ошибка: Используйте: create_table <имя_таблицы> "
+                    "<столбец1:тип> [столбец2:тип ...]"
+                )
                 if len(args) < 3:
-                    print(
-                        "Ошибка: Используйте: create_table <имя_таблицы> "
-                        "<столбец1:тип> [столбец2:тип ...]"
-                    )
+                    print(usage)
                     continue
                 
                 table_name = args[1]
                 columns = []
+                column_args = args[2:]
+                partition = None
+                compress = False
+                
+                # Опция сжатия указывается последней
+                if column_args[-1].lower() == "compress":
+                    compress = True
+                    column_args = column_args[:-1]
+                
+                # Отделяем описание секционирования от списка столбцов
+                lowered = [arg.lower() for arg in column_args]
+                if "partition" in lowered:
+                    partition_index = lowered.index("partition")
+                    partition = parse_partition_clause(
+                        column_args[partition_index + 1:]
+                    )
+                    if partition is None:
+                        continue
+                    column_args = column_args[:partition_index]
                 
-                for col_arg in args[2:]:
+                # После опций должен остаться хотя бы один столбец
+                if not column_args:
+                    print(usage)
+                    continue
+                
+                for col_arg in column_args:
                     if ":" not in col_arg:
                         print(
                             f"Ошибка: Неверный формат столбца '{col_arg}'. "
@@ -105,7 +172,9 @@ def run():
                     columns.append((col_name.strip(), col_type.strip().lower()))
                 else:
                     # Все столбцы успешно разобраны
-                    metadata = create_table(metadata, table_name, columns)
+                    metadata = create_table(
+                        metadata, table_name, columns, partition, compress
+                    )
                     save_metadata("database.json", metadata)
                     
             elif command == "list_tables":
@@ -131,13 +200,10 @@ def run():
                 table_name = args[1]
                 values = args[2:]
                 
-                # Загружаем данные таблицы
-                table_data = load_table_data(table_name)
-                
-                # Выполняем вставку
+                # Выполняем вставку (данные сохраняются внутри insert)
                 new_data = insert(metadata, table_name, values)
                 if new_data:
-                    save_table_data(table_name, new_data)
+                    save_metadata("database.json", metadata)
                     print("Запись успешно добавлена")
                 
             elif command == "select":
@@ -147,27 +213,106 @@ def run():
                 
                 table_name = args[1]
                 
+                # Отделяем имя снимка, если чтение идет из снимка
+                snapshot_name = None
+                if len(args) > 3 and args[-2].lower() == "snapshot":
+                    snapshot_name = args[-1]
+                    args = args[:-2]
+                    if snapshot_name not in list_snapshots():
+                        print(f"Ошибка: Снимок '{snapshot_name}' не существует")
+                        continue
+                
+                query_metadata = metadata
+                if snapshot_name is not None:
+                    query_metadata = load_snapshot_metadata(snapshot_name)
+                
                 # Проверяем существование таблицы
-                if "tables" not in metadata or table_name not in metadata["tables"]:
+                if (
+                    "tables" not in query_metadata
+                    or table_name not in query_metadata["tables"]
+                ):
                     print(f"Ошибка: Таблица '{table_name}' не существует")
                     continue
                 
-                # Загружаем данные таблицы
-                table_data = load_table_data(table_name)
-                
                 # Парсим условие WHERE если есть
                 where_clause = None
                 if len(args) > 3 and args[2].lower() == "where":
                     where_str = ' '.join(args[3:])
                     where_clause = parse_where_condition(where_str)
                 
+                # Загружаем данные таблицы по выбранному плану доступа;
+                # файлы снимка не меняются и читаются без блокировки
+                if snapshot_name is not None:
+                    table_data = load_table(
+                        query_metadata,
+                        table_name,
+                        where_clause,
+                        snapshot_data_dir(snapshot_name),
+                        filter_rows=True,
+                    )
+                else:
+                    table_data = load_table_for_query(
+                        metadata, table_name, where_clause, filter_rows=True
+                    )
+                
                 # Выполняем выборку
                 result_data = select(table_data, where_clause)
                 
                 # Выводим результат
-                table_info = metadata["tables"][table_name]
+                table_info = query_metadata["tables"][table_name]
                 print_table_data(result_data, table_info["columns"])
                 
+            elif command in ("snapshot", "restore"):
+                if len(args) < 2:
+                    print(f"Ошибка: Используйте: {command} <имя_снимка>")
+                    continue
+                
+                if command == "snapshot":
+                    metadata = create_snapshot(metadata, args[1])
+                else:
+                    metadata = restore_snapshot(metadata, args[1])
+                
+            elif command == "list_snapshots":
+                snapshots = list_snapshots()
+                if not snapshots:
+                    print("Снимки не найдены")
+                else:
+                    print("\nСписок снимков:")
+                    for name in snapshots:
+                        print(f"  {name}")
+                
+            elif command in ("analyze", "explain"):
+                if len(args) < 2:
+                    print(f"Ошибка: Используйте: {command} <таблица>")
+                    continue
+                
+                table_name = args[1]
+                
+                # Проверяем существование таблицы
+                if "tables" not in metadata or table_name not in metadata["tables"]:
+                    print(f"Ошибка: Таблица '{table_name}' не существует")
+                    continue
+                
+                if command == "analyze":
+                    metadata = analyze_table(metadata, table_name)
+                    save_metadata("database.json", metadata)
+                    continue
+                
+                where_clause = None
+                if len(args) > 3 and args[2].lower() == "where":
+                    where_clause = parse_where_condition(' '.join(args[3:]))
+                
+                plan = choose_access_path(metadata, table_name, where_clause)
+                estimated_rows = plan["estimated_rows"]
+                if estimated_rows is None:
+                    estimated_rows = "нет статистики"
+                else:
+                    estimated_rows = round(estimated_rows)
+                line = f"План: {plan['path']}, оценка записей: {estimated_rows}"
+                if plan["partitions"] is not None:
+                    line += f", секций для чтения: {len(plan['partitions'])}"
+                print(line)
+                
             elif command == "update":
                 if len(args) < 4:
                     print(
@@ -183,9 +328,6 @@ def run():
                     print(f"Ошибка: Таблица '{table_name}' не существует")
                     continue
                 
-                # Загружаем данные таблицы
-                table_data = load_table_data(table_name)
-                
                 # Парсим SET и WHERE условия
                 set_str = ""
                 where_str = ""
@@ -213,11 +355,14 @@ def run():
                 if set_clause is None:
                     continue
                 
-                # Выполняем обновление
-                new_data = update(table_data, set_clause, where_clause)
-                if new_data:
-                    save_table_data(table_name, new_data)
-                    print("Данные успешно обновлены")
+                # Загружаем данные таблицы по выбранному плану доступа
+                table_data = load_table_for_query(metadata, table_name, where_clause)
+                
+                # Выполняем обновление (изменения дописываются в журнал таблицы)
+                metadata = update(
+                    metadata, table_name, table_data, set_clause, where_clause
+                )
+                save_metadata("database.json", metadata)
                 
             elif command == "delete":
                 if len(args) < 4 or args[2].lower() != "where":
@@ -231,9 +376,6 @@ def run():
                     print(f"Ошибка: Таблица '{table_name}' не существует")
                     continue
                 
-                # Загружаем данные таблицы
-                table_data = load_table_data(table_name)
-                
                 # Парсим условие WHERE
                 where_str = ' '.join(args[3:])
                 where_clause = parse_where_condition(where_str)
@@ -241,11 +383,12 @@ def run():
                 if where_clause is None:
                     continue
                 
-                # Выполняем удаление
-                new_data = delete(table_data, where_clause)
-                if new_data is not None:
-                    save_table_data(table_name, new_data)
-                    print("Данные успешно удалены")
+                # Загружаем данные таблицы по выбранному плану доступа
+                table_data = load_table_for_query(metadata, table_name, where_clause)
+                
+                # Выполняем удаление (отметки об удалении дописываются в журнал)
+                metadata = delete(metadata, table_name, table_data, where_clause)
+                save_metadata("database.json", metadata)
                 
             else:
                 print(f"Неизвестная команда: {command}")
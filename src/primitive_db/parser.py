@@ -114,4 +114,46 @@ def parse_value(value_str):
         pass
     
     # Если ничего не подошло, возвращаем как строку
-    return value_str
\ No newline at end of file
+    return value_str
+
+
+def parse_partition_clause(tokens):
+    """
+    Парсит описание секционирования таблицы.
+    
+    Args:
+        tokens (list): Слова после ключевого слова partition, например
+            ["by", "department"], ["by", "department", "hash", "4"]
+            или ["by", "age", "range", "10"]
+        
+    Returns:
+        dict: Описание секционирования или None в случае ошибки
+    """
+    usage = (
+        "Ошибка: Используйте: partition by <столбец> "
+        "[hash <число_секций> | range <шаг>]"
+    )
+    if len(tokens) not in (2, 4) or tokens[0].lower() != "by":
+        print(usage)
+        return None
+    
+    partition = {"column": tokens[1], "method": "value"}
+    if len(tokens) == 2:
+        return partition
+    
+    method = tokens[2].lower()
+    if method not in ("hash", "range"):
+        print(usage)
+        return None
+    
+    try:
+        size = int(tokens[3])
+    except ValueError:
+        size = 0
+    if size <= 0:
+        print(f"Ошибка: Параметр '{method}' должен быть положительным числом")
+        return None
+    
+    partition["method"] = method
+    partition["count" if method == "hash" else "step"] = size
+    return partition
@@ -0,0 +1,227 @@
+# src/primitive_db/partitions.py
+import hashlib
+import os
+import zlib
+
+from .utils import DATA_DIR, DELTA_SUFFIX, load_table_data, remove_table_data
+
+# value - отдельная секция на каждое значение столбца,
+# hash - фиксированное число секций, range - диапазоны целых чисел
+PARTITION_METHODS = {"value", "hash", "range"}
+
+# Длинные значения сокращаются, чтобы имя файла секции (вместе с
+# суффиксом журнала) не превышало ограничение файловой системы
+MAX_KEY_LENGTH = 100
+
+# Типы Python для значений столбцов
+COLUMN_TYPES = {"int": int, "str": str, "bool": bool}
+
+
+def get_partition_spec(metadata, table_name):
+    """
+    Возвращает описание секционирования таблицы.
+    
+    Args:
+        metadata (dict): Метаданные базы данных
+        table_name (str): Имя таблицы
+    
+    Returns:
+        dict: Описание секционирования или None, если таблица не секционирована
+    """
+    return metadata.get("tables", {}).get(table_name, {}).get("partition")
+
+
+def partition_key(spec, value):
+    """
+    Вычисляет имя секции для значения ключа секционирования.
+    
+    Args:
+        spec (dict): Описание секционирования
+        value: Значение столбца
+    
+    Returns:
+        str: Имя секции или None, если значение не может попасть ни в одну секцию
+    """
+    method = spec["method"]
+    if method == "hash":
+        # crc32 стабилен между запусками, в отличие от встроенного hash()
+        bucket = zlib.crc32(str(value).encode("utf-8")) % spec["count"]
+        return f"h{bucket}"
+    if method == "range":
+        if type(value) is not int:
+            return None
+        start = value // spec["step"] * spec["step"]
+        return f"r{start}"
+    # Значение записывается в hex: в имени остаются только цифры и
+    # строчные буквы, поэтому на файловых системах без учета регистра
+    # значения "IT" и "It" не попадают в один файл
+    key = str(value).encode("utf-8").hex()
+    if len(key) > MAX_KEY_LENGTH:
+        # В hex нет символа "+", поэтому такие имена не совпадут
+        # с именами коротких значений
+        digest = hashlib.sha1(str(value).encode("utf-8")).hexdigest()
+        key = f"{key[:MAX_KEY_LENGTH - len(digest) - 1]}+{digest}"
+    return "v_" + key
+
+
+def can_prune(metadata, table_name, where_clause):
+    """
+    Проверяет, можно ли отсечь секции по условию WHERE.
+    
+    Отсечение возможно, только если условие задано по столбцу
+    секционирования значением того же типа, что и столбец: иначе
+    сравнение при полном просмотре (например, True == 1) может найти
+    записи в секции с другим именем.
+    
+    Args:
+        metadata (dict): Метаданные базы данных
+        table_name (str): Имя таблицы
+        where_clause (dict): Условие WHERE или None
+    
+    Returns:
+        bool: True, если достаточно прочитать секцию значения из условия
+    """
+    spec = get_partition_spec(metadata, table_name)
+    if spec is None or not where_clause or spec["column"] not in where_clause:
+        return False
+    column_type = dict(metadata["tables"][table_name]["columns"])[spec["column"]]
+    # bool - подкласс int, поэтому тип сравнивается точно
+    return type(where_clause[spec["column"]]) is COLUMN_TYPES[column_type]
+
+
+def storage_name(metadata, table_name, row):
+    """
+    Возвращает имя хранилища (таблицы или ее секции), в котором лежит запись.
+    
+    Args:
+        metadata (dict): Метаданные базы данных
+        table_name (str): Имя таблицы
+        row (dict): Запись таблицы
+    
+    Returns:
+        str: Имя для функций load_table_data/append_table_changes
+    """
+    spec = get_partition_spec(metadata, table_name)
+    if spec is None:
+        return table_name
+    key = partition_key(spec, row[spec["column"]])
+    if key is None:
+        raise ValueError(
+            f"Значение '{row[spec['column']]}' не попадает ни в одну секцию"
+        )
+    return f"{table_name}/{key}"
+
+
+def list_partitions(table_name, data_dir=DATA_DIR):
+    """
+    Возвращает имена существующих секций таблицы.
+    
+    Args:
+        table_name (str): Имя таблицы
+        data_dir (str): Директория с файлами данных
+    
+    Returns:
+        list: Отсортированные имена секций
+    """
+    dirpath = f"{data_dir}/{table_name}"
+    if not os.path.isdir(dirpath):
+        return []
+    # Новая секция может состоять только из журнала изменений
+    partitions = set()
+    for filename in os.listdir(dirpath):
+        for suffix in (".json", DELTA_SUFFIX):
+            if filename.endswith(suffix):
+                partitions.add(filename[:-len(suffix)])
+    return sorted(partitions)
+
+
+def prune_partitions(
+    metadata, table_name, where_clause, data_dir=DATA_DIR, partitions=None
+):
+    """
+    Отбирает секции, в которых могут быть записи, подходящие под условие.
+    
+    Args:
+        metadata (dict): Метаданные базы данных
+        table_name (str): Имя таблицы
+        where_clause (dict): Условие WHERE или None
+        data_dir (str): Директория с файлами данных
+        partitions (list): Уже прочитанный список секций (см. list_partitions)
+    
+    Returns:
+        list: Имена секций для чтения
+    """
+    spec = get_partition_spec(metadata, table_name)
+    if partitions is None:
+        partitions = list_partitions(table_name, data_dir)
+    if not can_prune(metadata, table_name, where_clause):
+        return partitions
+    
+    key = partition_key(spec, where_clause[spec["column"]])
+    return [key] if key in partitions else []
+
+
+def load_table(
+    metadata, table_name, where_clause=None, data_dir=DATA_DIR, filter_rows=False
+):
+    """
+    Загружает данные таблицы, читая только нужные секции.
+    
+    Секции загружаются целиком, поэтому результат можно передавать
+    в update/delete. С filter_rows=True часть неподходящих под условие
+    записей может быть отброшена еще при чтении (только для выборки).
+    
+    Args:
+        metadata (dict): Метаданные базы данных
+        table_name (str): Имя таблицы
+        where_clause (dict): Условие WHERE для отсечения секций
+        data_dir (str): Директория с файлами данных (например, снимка)
+        filter_rows (bool): Разрешить отбор записей по условию при чтении
+    
+    Returns:
+        list: Записи таблицы, упорядоченные по ID
+    """
+    row_filter = where_clause if filter_rows else None
+    if get_partition_spec(metadata, table_name) is None:
+        return load_table_data(table_name, data_dir, row_filter)
+    
+    partitions = prune_partitions(metadata, table_name, where_clause, data_dir)
+    return load_partitions(table_name, partitions, data_dir, row_filter)
+
+
+def load_partitions(table_name, partitions, data_dir=DATA_DIR, row_filter=None):
+    """
+    Загружает перечисленные секции таблицы.
+    
+    Args:
+        table_name (str): Имя таблицы
+        partitions (list): Имена секций
+        data_dir (str): Директория с файлами данных
+        row_filter (dict): Условие, по которому записи можно отбросить
+            еще при чтении (см. load_table_data)
+    
+    Returns:
+        list: Записи секций, упорядоченные по ID
+    """
+    table_data = []
+    for key in partitions:
+        table_data.extend(
+            load_table_data(f"{table_name}/{key}", data_dir, row_filter)
+        )
+    # Перенесенные между секциями записи дописываются в конец журнала
+    table_data.sort(key=lambda row: row["ID"])
+    return table_data
+
+
+def remove_partitions(table_name):
+    """
+    Удаляет все секции таблицы вместе с ее директорией.
+    
+    Args:
+        table_name (str): Имя таблицы
+    """
+    for key in list_partitions(table_name):
+        remove_table_data(f"{table_name}/{key}")
+    dirpath = f"{DATA_DIR}/{table_name}"
+    if os.path.isdir(dirpath) and not os.listdir(dirpath):
+        os.rmdir(dirpath)
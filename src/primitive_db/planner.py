@@ -0,0 +1,80 @@
+# src/primitive_db/planner.py
+from .partitions import (
+    can_prune,
+    get_partition_spec,
+    list_partitions,
+    load_partitions,
+    prune_partitions,
+)
+from .stats import estimate_rows
+from .utils import load_table_data
+
+
+def choose_access_path(metadata, table_name, where_clause):
+    """
+    Выбирает способ чтения таблицы для условия WHERE.
+    
+    Условия бывают только на равенство, поэтому выбор - это правило,
+    а не сравнение стоимостей:
+        empty - статистика доказывает, что подходящих записей нет,
+            файлы не читаются;
+        partition - условие по ключу секционирования значением того же
+            типа, что и столбец: читается одна секция, что никогда
+            не дороже полного просмотра;
+        scan - во всех остальных случаях читается вся таблица.
+    
+    Args:
+        metadata (dict): Метаданные базы данных
+        table_name (str): Имя таблицы
+        where_clause (dict): Условие WHERE или None
+    
+    Returns:
+        dict: План с ключами path, estimated_rows и partitions (секции
+        для чтения или None, если таблица не секционирована)
+    """
+    stats = metadata["tables"][table_name].get("stats")
+    
+    estimated_rows = stats["row_count"] if stats else None
+    if stats and where_clause:
+        for column, value in where_clause.items():
+            estimated_rows = min(estimated_rows, estimate_rows(stats, column, value))
+    
+    if stats and where_clause and estimated_rows == 0:
+        return {"path": "empty", "estimated_rows": 0, "partitions": []}
+    
+    plan = {"path": "scan", "estimated_rows": estimated_rows, "partitions": None}
+    spec = get_partition_spec(metadata, table_name)
+    if spec is None:
+        return plan
+    
+    # Директория секций читается один раз и для плана, и для отсечения
+    plan["partitions"] = list_partitions(table_name)
+    if can_prune(metadata, table_name, where_clause):
+        plan["path"] = "partition"
+        plan["partitions"] = prune_partitions(
+            metadata, table_name, where_clause, partitions=plan["partitions"]
+        )
+    return plan
+
+
+def load_table_for_query(metadata, table_name, where_clause, filter_rows=False):
+    """
+    Загружает данные таблицы по выбранному плану доступа.
+    
+    Args:
+        metadata (dict): Метаданные базы данных
+        table_name (str): Имя таблицы
+        where_clause (dict): Условие WHERE или None
+        filter_rows (bool): Разрешить отбор записей по условию при чтении
+            (только для выборки, см. partitions.load_table)
+    
+    Returns:
+        list: Данные, среди которых есть все записи, подходящие под условие
+    """
+    plan = choose_access_path(metadata, table_name, where_clause)
+    row_filter = where_clause if filter_rows else None
+    if plan["path"] == "empty":
+        return []
+    if plan["partitions"] is None:
+        return load_table_data(table_name, where_clause=row_filter)
+    return load_partitions(table_name, plan["partitions"], row_filter=row_filter)
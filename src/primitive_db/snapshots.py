@@ -0,0 +1,229 @@
+# src/primitive_db/snapshots.py
+import os
+import shutil
+
+from .decorators import confirm_action, handle_db_errors, log_time
+from .utils import (
+    DATA_DIR,
+    DELTA_SUFFIX,
+    JOURNAL_SIZE_SUFFIX,
+    complete_journal_size,
+    load_metadata,
+    read_journal_limit,
+    save_metadata,
+    storage_lock,
+)
+
+# Каждый снимок - директория с копией метаданных и файлов данных
+SNAPSHOTS_DIR = "snapshots"
+METADATA_FILE = "database.json"
+
+# Промежуточные копии при восстановлении: данные и метаданные снимка
+# и прежние данные, которые удаляются только после замены метаданных
+RESTORED_DIR = f"{DATA_DIR}.restore"
+RESTORED_METADATA_FILE = f"{METADATA_FILE}.restore"
+OLD_DATA_DIR = f"{DATA_DIR}.old"
+
+
+def snapshot_data_dir(name):
+    """
+    Возвращает директорию с файлами данных снимка.
+    
+    Args:
+        name (str): Имя снимка
+    
+    Returns:
+        str: Путь, который можно передавать как data_dir в функции загрузки
+    """
+    return f"{SNAPSHOTS_DIR}/{name}/{DATA_DIR}"
+
+
+def load_snapshot_metadata(name):
+    """
+    Загружает метаданные снимка.
+    
+    Args:
+        name (str): Имя снимка
+    
+    Returns:
+        dict: Метаданные снимка или пустой словарь, если снимка нет
+    """
+    return load_metadata(f"{SNAPSHOTS_DIR}/{name}/{METADATA_FILE}")
+
+
+def list_snapshots():
+    """
+    Возвращает имена существующих снимков.
+    
+    Returns:
+        list: Отсортированные имена снимков
+    """
+    if not os.path.isdir(SNAPSHOTS_DIR):
+        return []
+    return sorted(
+        name
+        for name in os.listdir(SNAPSHOTS_DIR)
+        if not name.endswith(".tmp")
+        and os.path.isfile(f"{SNAPSHOTS_DIR}/{name}/{METADATA_FILE}")
+    )
+
+
+def _link_file(src, dst):
+    """Создает жесткую ссылку на файл или копирует его."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Файловая система без жестких ссылок
+        shutil.copy2(src, dst)
+
+
+def _copy_journal(src, dst, size):
+    """Копирует первые size байт журнала (все при size = -1)."""
+    with open(src, 'rb') as source, open(dst, 'wb') as target:
+        target.write(source.read(size))
+
+
+def _link_tree(src_dir, dst_dir, for_restore=False):
+    """
+    Воспроизводит дерево файлов данных в новой директории.
+    
+    Основные файлы таблиц всегда перезаписываются через os.replace и
+    никогда не меняются на месте, поэтому вместо копирования на них
+    создаются жесткие ссылки. Журналы изменений только дописываются
+    (и обрезаются лишь после последнего перевода строки), поэтому в
+    снимок они тоже попадают ссылками, а рядом записывается их длина.
+    При восстановлении журналы копируются до этой длины: дописанное
+    позже в снимок не входит.
+    
+    Args:
+        src_dir (str): Исходная директория
+        dst_dir (str): Новая директория (не должна существовать)
+        for_restore (bool): Копировать журналы из снимка в рабочие данные
+    """
+    os.makedirs(dst_dir)
+    if not os.path.isdir(src_dir):
+        return
+    
+    for root, _, filenames in os.walk(src_dir):
+        target_root = os.path.join(dst_dir, os.path.relpath(root, src_dir))
+        os.makedirs(target_root, exist_ok=True)
+        for filename in filenames:
+            src = os.path.join(root, filename)
+            dst = os.path.join(target_root, filename)
+            if filename.endswith(DELTA_SUFFIX) and for_restore:
+                _copy_journal(src, dst, read_journal_limit(src))
+            elif filename.endswith(DELTA_SUFFIX):
+                size = complete_journal_size(src)
+                _link_file(src, dst)
+                with open(f"{dst}{JOURNAL_SIZE_SUFFIX}", 'w', encoding='utf-8') as file:
+                    file.write(str(size))
+            elif filename.endswith(".json"):
+                _link_file(src, dst)
+
+
+@handle_db_errors
+@log_time
+def create_snapshot(metadata, name):
+    """
+    Создает согласованный снимок метаданных и всех таблиц.
+    """
+    # Имена с ".tmp" на конце заняты временными директориями, а
+    # разделители путей ("\\" - на Windows) вывели бы снимок за пределы
+    # директории snapshots
+    if (
+        not name
+        or "/" in name
+        or "\\" in name
+        or name.startswith(".")
+        or name.endswith(".tmp")
+    ):
+        print(f"Ошибка: Недопустимое имя снимка '{name}'")
+        return metadata
+    
+    snapshot_dir = f"{SNAPSHOTS_DIR}/{name}"
+    if os.path.exists(snapshot_dir):
+        print(f"Ошибка: Снимок '{name}' уже существует")
+        return metadata
+    
+    # Собираем снимок во временной директории и публикуем его одним
+    # переименованием, чтобы не оставить наполовину записанный снимок
+    tmp_dir = f"{snapshot_dir}.tmp"
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    
+    # Блокировка не дает фоновой компакции изменить файлы во время снимка
+    with storage_lock:
+        _link_tree(DATA_DIR, f"{tmp_dir}/{DATA_DIR}")
+        save_metadata(f"{tmp_dir}/{METADATA_FILE}", metadata)
+    os.replace(tmp_dir, snapshot_dir)
+    
+    print(f"Снимок '{name}' успешно создан")
+    return metadata
+
+
+@handle_db_errors
+def recover_restore():
+    """
+    Доводит до конца восстановление из снимка, прерванное сбоем.
+    
+    Восстановление идет в таком порядке: копии данных и метаданных
+    снимка готовятся рядом с текущими, data переименовывается в data.old,
+    копия данных - в data, копия метаданных - в database.json, и только
+    после этого data.old удаляется. Поэтому если data.old существует,
+    копии снимка уже полностью готовы и восстановление можно завершить.
+    Если data.old нет, обмен не начинался и недописанные копии удаляются.
+    """
+    with storage_lock:
+        if not os.path.exists(OLD_DATA_DIR):
+            if os.path.exists(RESTORED_DIR):
+                shutil.rmtree(RESTORED_DIR)
+            if os.path.exists(RESTORED_METADATA_FILE):
+                os.remove(RESTORED_METADATA_FILE)
+            return
+        
+        if os.path.exists(RESTORED_DIR):
+            # Пустая data могла быть создана уже после сбоя; непустая
+            # директория не будет заменена, и data.old останется на месте
+            if os.path.isdir(DATA_DIR) and not os.listdir(DATA_DIR):
+                os.rmdir(DATA_DIR)
+            os.replace(RESTORED_DIR, DATA_DIR)
+        if os.path.exists(RESTORED_METADATA_FILE):
+            os.replace(RESTORED_METADATA_FILE, METADATA_FILE)
+        shutil.rmtree(OLD_DATA_DIR)
+
+
+@handle_db_errors
+@confirm_action("восстановление из снимка")
+def restore_snapshot(metadata, name):
+    """
+    Заменяет текущие метаданные и данные таблиц содержимым снимка.
+    """
+    if name not in list_snapshots():
+        print(f"Ошибка: Снимок '{name}' не существует")
+        return metadata
+    
+    recover_restore()
+    if os.path.exists(OLD_DATA_DIR) or os.path.exists(RESTORED_DIR):
+        print(
+            "Ошибка: Прерванное восстановление не завершено, "
+            f"проверьте {OLD_DATA_DIR} и {RESTORED_DIR}"
+        )
+        return metadata
+    
+    with storage_lock:
+        _link_tree(snapshot_data_dir(name), RESTORED_DIR, for_restore=True)
+        shutil.copyfile(
+            f"{SNAPSHOTS_DIR}/{name}/{METADATA_FILE}", RESTORED_METADATA_FILE
+        )
+        # data.old создается всегда, даже пустой: по ней recover_restore
+        # узнает, что копии снимка готовы
+        if os.path.exists(DATA_DIR):
+            os.replace(DATA_DIR, OLD_DATA_DIR)
+        else:
+            os.makedirs(OLD_DATA_DIR)
+        os.replace(RESTORED_DIR, DATA_DIR)
+        os.replace(RESTORED_METADATA_FILE, METADATA_FILE)
+        shutil.rmtree(OLD_DATA_DIR)
+    
+    print(f"Данные восстановлены из снимка '{name}'")
+    return load_metadata(METADATA_FILE)
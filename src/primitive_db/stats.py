@@ -0,0 +1,210 @@
+# src/primitive_db/stats.py
+from collections import Counter
+
+# Сколько самых частых значений столбца хранится в статистике
+TOP_K = 10
+
+
+def _column_statistics(counter):
+    """
+    Строит статистику столбца по частотам его значений.
+    
+    Args:
+        counter (Counter): Частоты значений столбца
+    
+    Returns:
+        dict: Статистика столбца
+    """
+    try:
+        min_value = min(counter) if counter else None
+        max_value = max(counter) if counter else None
+    except TypeError:
+        # Несравнимые значения - границы неизвестны
+        min_value = max_value = None
+    
+    return {
+        "distinct": len(counter),
+        "min": min_value,
+        "max": max_value,
+        "top": [[value, count] for value, count in counter.most_common(TOP_K)],
+        # True, если в top перечислены все значения столбца
+        "complete": len(counter) <= TOP_K,
+    }
+
+
+def collect_statistics(table_data, columns):
+    """
+    Собирает статистику таблицы полным проходом по данным.
+    
+    Args:
+        table_data (list): Данные таблицы
+        columns (list): Столбцы таблицы в формате [имя, тип]
+    
+    Returns:
+        dict: Число записей и статистика по каждому столбцу
+    """
+    return {
+        "row_count": len(table_data),
+        "columns": {
+            col[0]: _column_statistics(Counter(row.get(col[0]) for row in table_data))
+            for col in columns
+        },
+    }
+
+
+def empty_statistics(columns):
+    """
+    Возвращает статистику пустой таблицы.
+    
+    Args:
+        columns (list): Столбцы таблицы в формате [имя, тип]
+    
+    Returns:
+        dict: Статистика без записей
+    """
+    return collect_statistics([], columns)
+
+
+def _find_top(column_stats, value):
+    """Возвращает пару [значение, частота] из top или None."""
+    for item in column_stats["top"]:
+        if item[0] == value:
+            return item
+    return None
+
+
+def _add_value(column_stats, value, table_was_empty):
+    """Учитывает появление значения в столбце."""
+    # Границы только расширяются, поэтому после удалений они остаются
+    # верными, хоть и не точными
+    if column_stats["min"] is None and table_was_empty:
+        column_stats["min"] = column_stats["max"] = value
+    elif column_stats["min"] is not None:
+        try:
+            column_stats["min"] = min(column_stats["min"], value)
+            column_stats["max"] = max(column_stats["max"], value)
+        except TypeError:
+            column_stats["min"] = column_stats["max"] = None
+    
+    item = _find_top(column_stats, value)
+    if item is not None:
+        item[1] += 1
+    elif column_stats["complete"]:
+        # Значения нет среди всех известных - оно точно новое
+        column_stats["distinct"] += 1
+        if len(column_stats["top"]) < TOP_K:
+            column_stats["top"].append([value, 1])
+        else:
+            column_stats["complete"] = False
+    
+    column_stats["top"].sort(key=lambda pair: -pair[1])
+
+
+def _remove_value(column_stats, value):
+    """Учитывает исчезновение значения из столбца."""
+    item = _find_top(column_stats, value)
+    if item is None:
+        return
+    
+    # Частоты значений из top точные, поэтому нулевая частота
+    # означает, что значение исчезло из столбца
+    item[1] -= 1
+    if item[1] <= 0:
+        column_stats["top"].remove(item)
+        column_stats["distinct"] -= 1
+    column_stats["top"].sort(key=lambda pair: -pair[1])
+
+
+def record_insert(table_info, row):
+    """
+    Обновляет статистику таблицы после вставки записи.
+    
+    Args:
+        table_info (dict): Описание таблицы из метаданных
+        row (dict): Вставленная запись
+    """
+    stats = table_info.get("stats")
+    if stats is None:
+        return
+    
+    for column, column_stats in stats["columns"].items():
+        _add_value(column_stats, row.get(column), stats["row_count"] == 0)
+    stats["row_count"] += 1
+
+
+def record_update(table_info, old_values, new_values):
+    """
+    Обновляет статистику таблицы после изменения записи.
+    
+    Args:
+        table_info (dict): Описание таблицы из метаданных
+        old_values (dict): Прежние значения измененных полей
+        new_values (dict): Новые значения измененных полей
+    """
+    stats = table_info.get("stats")
+    if stats is None:
+        return
+    
+    for column, value in new_values.items():
+        column_stats = stats["columns"].get(column)
+        if column_stats is None:
+            continue
+        _remove_value(column_stats, old_values[column])
+        _add_value(column_stats, value, False)
+
+
+def record_delete(table_info, row):
+    """
+    Обновляет статистику таблицы после удаления записи.
+    
+    Args:
+        table_info (dict): Описание таблицы из метаданных
+        row (dict): Удаленная запись
+    """
+    stats = table_info.get("stats")
+    if stats is None:
+        return
+    
+    for column, column_stats in stats["columns"].items():
+        _remove_value(column_stats, row.get(column))
+    stats["row_count"] = max(stats["row_count"] - 1, 0)
+
+
+def estimate_rows(stats, column, value):
+    """
+    Оценивает число записей, у которых столбец равен значению.
+    
+    Args:
+        stats (dict): Статистика таблицы
+        column (str): Имя столбца
+        value: Искомое значение
+    
+    Returns:
+        float: Оценка числа записей (0 - записей точно нет)
+    """
+    row_count = stats["row_count"]
+    column_stats = stats["columns"].get(column)
+    if column_stats is None:
+        return row_count
+    if row_count == 0:
+        return 0
+    
+    # Значение вне диапазона [min, max] не встречается в столбце
+    if column_stats["min"] is not None:
+        try:
+            if value < column_stats["min"] or value > column_stats["max"]:
+                return 0
+        except TypeError:
+            # Значения разных типов никогда не равны
+            return 0
+    
+    item = _find_top(column_stats, value)
+    if item is not None:
+        return item[1]
+    if column_stats["complete"]:
+        return 0
+    
+    # Остальные записи считаем равномерно распределенными по редким значениям
+    rest_rows = row_count - sum(count for _, count in column_stats["top"])
+    rest_distinct = column_stats["distinct"] - len(column_stats["top"])
+    return max(rest_rows, 0) / max(rest_distinct, 1)
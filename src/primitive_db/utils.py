@@ -3,6 +3,37 @@
 
 import json
 import os
+import sys
+import threading
+import zlib
+from contextlib import nullcontext
+
+# Директория с файлами данных таблиц
+DATA_DIR = "data"
+
+# Файлы журналов изменений (дельт) лежат рядом с основным файлом таблицы
+DELTA_SUFFIX = ".delta.jsonl"
+
+# Рядом с журналом в снимке хранится его длина на момент снимка
+JOURNAL_SIZE_SUFFIX = ".size"
+
+# Компакция запускается, когда журнал превышает долю от размера основного файла
+COMPACT_MIN_BYTES = 64 * 1024
+COMPACT_RATIO = 0.25
+
+# Строковый столбец кодируется словарем, если различных значений
+# не больше этой доли от числа записей
+DICTIONARY_MAX_RATIO = 0.5
+
+# Уровень сжатия zlib для таблиц, созданных с опцией compress
+COMPRESSION_LEVEL = 6
+
+# Версия формата файлов с кодированием словарем
+ENCODED_FORMAT = 2
+
+# Блокировка защищает файлы таблиц от одновременной записи и компакции
+storage_lock = threading.RLock()
+_compacting = set()
 
 
 def load_metadata(filepath):
@@ -40,44 +71,471 @@ def save_metadata(filepath, data):
         print(f"Ошибка при сохранении файла {filepath}: {e}")
 
 
-def load_table_data(table_name):
+def _table_path(table_name, data_dir=DATA_DIR):
+    """Возвращает путь к основному файлу таблицы."""
+    return f"{data_dir}/{table_name}.json"
+
+
+def _delta_path(table_name, data_dir=DATA_DIR):
+    """Возвращает путь к журналу изменений таблицы."""
+    return f"{data_dir}/{table_name}{DELTA_SUFFIX}"
+
+
+def _encode_rows(data):
     """
-    Загружает данные таблицы из JSON-файла.
+    Кодирует записи таблицы для хранения на диске.
+    
+    Записи хранятся списками значений в порядке столбцов, а строковые
+    столбцы с небольшим числом различных значений заменяются номерами
+    в словаре этого столбца.
     
     Args:
-        table_name (str): Имя таблицы
+        data (list): Записи таблицы
         
     Returns:
-        list: Данные таблицы или пустой список, если файл не найден
+        dict | list: Закодированная таблица или исходные записи, если
+        у записей разный набор столбцов
+    """
+    if not data:
+        return data
+    
+    columns = list(data[0])
+    column_set = set(columns)
+    if any(row.keys() != column_set for row in data):
+        return data
+    
+    rows = [[row[column] for column in columns] for row in data]
+    
+    dictionaries = {}
+    max_distinct = len(rows) * DICTIONARY_MAX_RATIO
+    for index, column in enumerate(columns):
+        distinct = set()
+        for values in rows:
+            value = values[index]
+            if not isinstance(value, str):
+                break
+            distinct.add(value)
+            if len(distinct) > max_distinct:
+                break
+        else:
+            dictionary = sorted(distinct)
+            codes = {value: code for code, value in enumerate(dictionary)}
+            for values in rows:
+                values[index] = codes[values[index]]
+            dictionaries[column] = dictionary
+    
+    return {
+        "format": ENCODED_FORMAT,
+        "columns": columns,
+        "dictionaries": dictionaries,
+        "rows": rows,
+    }
+
+
+def _decode_rows(encoded, where_clause=None, keep_ids=None):
+    """
+    Восстанавливает записи из закодированной таблицы.
+    
+    Условия по закодированным столбцам проверяются сравнением номеров
+    до раскодирования, поэтому неподходящие записи не создаются вовсе.
+    Значения из словарей интернируются, так что одинаковые строки
+    в памяти - это один объект.
+    
+    Args:
+        encoded (dict): Закодированная таблица (см. _encode_rows)
+        where_clause (dict): Условие WHERE или None
+        keep_ids (set): ID записей, которые сохраняются независимо
+            от условия (их меняет журнал изменений)
+        
+    Returns:
+        list: Записи таблицы
     """
-    # Создаем директорию data, если она не существует
-    os.makedirs("data", exist_ok=True)
+    columns = encoded["columns"]
+    rows = encoded["rows"]
+    positions = {column: index for index, column in enumerate(columns)}
+    
+    decoders = []
+    for column, dictionary in encoded["dictionaries"].items():
+        decoders.append((positions[column], [sys.intern(v) for v in dictionary]))
     
-    filepath = f"data/{table_name}.json"
+    conditions = []
+    for column, value in (where_clause or {}).items():
+        dictionary = encoded["dictionaries"].get(column)
+        if dictionary is None:
+            continue
+        # Значения не из словаря (в том числе не строки) в столбце не
+        # встречаются: номер None не совпадет ни с одной записью
+        codes = {item: code for code, item in enumerate(dictionary)}
+        code = codes.get(value) if isinstance(value, str) else None
+        conditions.append((positions[column], code))
+    
+    if conditions:
+        keep_ids = keep_ids or set()
+        id_index = positions.get("ID")
+        rows = [
+            values
+            for values in rows
+            if all(values[index] == code for index, code in conditions)
+            or (id_index is not None and values[id_index] in keep_ids)
+        ]
+    
+    if not rows:
+        return []
+    
+    # Раскодируем столбцы целиком, а не каждую запись по отдельности
+    column_values = list(zip(*rows))
+    for index, dictionary in decoders:
+        column_values[index] = map(dictionary.__getitem__, column_values[index])
+    return [dict(zip(columns, values)) for values in zip(*column_values)]
+
+
+def _read_table_file(filepath):
+    """
+    Читает файл таблицы, сжатый zlib или обычный.
+    
+    Args:
+        filepath (str): Путь к файлу
+        
+    Returns:
+        dict | list: Содержимое файла
+    """
+    with open(filepath, 'rb') as file:
+        raw = file.read()
+    # JSON начинается с '[' или '{', а поток zlib - с байта 0x78
+    if raw[:1] == b'\x78':
+        raw = zlib.decompress(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def _write_table_file(filepath, data, compress=False):
+    """
+    Записывает таблицу во временный файл и атомарно подменяет им целевой.
+    
+    Args:
+        filepath (str): Путь к файлу
+        data: Данные для сохранения
+        compress (bool): Сжать файл zlib (чтение понимает оба варианта)
+    """
+    encoded = _encode_rows(data)
+    if isinstance(encoded, dict):
+        # Закодированный формат не предназначен для чтения глазами
+        text = json.dumps(encoded, ensure_ascii=False, separators=(',', ':'))
+    else:
+        text = json.dumps(encoded, ensure_ascii=False, indent=4)
+    raw = text.encode('utf-8')
+    if compress:
+        raw = zlib.compress(raw, COMPRESSION_LEVEL)
+    
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(raw)
+    os.replace(tmp_path, filepath)
+
+
+def complete_journal_size(delta_path):
+    """
+    Возвращает длину журнала без недописанной последней строки.
+    
+    Args:
+        delta_path (str): Путь к журналу изменений
+        
+    Returns:
+        int: Число байт до последнего перевода строки включительно
+    """
+    size = os.path.getsize(delta_path)
+    with open(delta_path, 'rb') as file:
+        # Недописанная строка бывает только после сбоя и обычно коротка
+        while size > 0:
+            file.seek(size - 1)
+            if file.read(1) == b"\n":
+                break
+            size -= 1
+    return size
+
+
+def read_journal_limit(delta_path):
+    """
+    Возвращает длину журнала, записанную при создании снимка.
+    
+    Журналы в снимке - жесткие ссылки на файлы, в которые продолжается
+    запись, поэтому читать их можно только до этой длины.
+    
+    Args:
+        delta_path (str): Путь к журналу изменений
+        
+    Returns:
+        int: Число байт для чтения или -1, если читать нужно весь файл
+    """
     try:
-        with open(filepath, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        with open(f"{delta_path}{JOURNAL_SIZE_SUFFIX}", encoding='utf-8') as file:
+            return int(file.read())
+    except FileNotFoundError:
+        return -1
+
+
+def _read_changes(table_name, data_dir=DATA_DIR):
+    """
+    Читает журнал изменений таблицы.
+    
+    Последняя строка без перевода строки считается недописанной после
+    сбоя и пропускается (при следующей записи она будет отрезана).
+    Испорченная строка в середине журнала - ошибка.
+    
+    Args:
+        table_name (str): Имя таблицы
+        data_dir (str): Директория с файлами данных
+        
+    Returns:
+        list: Записи журнала в порядке добавления
+    """
+    delta_path = _delta_path(table_name, data_dir)
+    try:
+        with open(delta_path, 'rb') as file:
+            raw = file.read(read_journal_limit(delta_path))
     except FileNotFoundError:
         return []
-    except json.JSONDecodeError:
-        print(f"Ошибка: Файл {filepath} содержит некорректный JSON")
-        return []
+    
+    lines = raw.split(b"\n")
+    # После последнего перевода строки остается пустая строка
+    # или недописанная запись - в обоих случаях ее не читаем
+    lines.pop()
+    
+    changes = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            changes.append(json.loads(line.decode('utf-8')))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ValueError(
+                f"Журнал {delta_path} поврежден в строке {number}: {e}"
+            ) from e
+    return changes
+
+
+def _trim_torn_tail(delta_path):
+    """
+    Отрезает недописанную последнюю строку журнала, оставшуюся после сбоя.
+    
+    Иначе следующая запись продолжила бы эту строку и стала нечитаемой.
+    
+    Args:
+        delta_path (str): Путь к журналу изменений
+    """
+    try:
+        file = open(delta_path, 'rb+')
+    except FileNotFoundError:
+        return
+    
+    with file:
+        end = file.seek(0, os.SEEK_END)
+        if end == 0:
+            return
+        file.seek(end - 1)
+        if file.read(1) == b"\n":
+            return
+        
+        # Ищем последний перевод строки, читая файл с конца блоками
+        position = end
+        while position > 0:
+            start = max(position - 4096, 0)
+            file.seek(start)
+            index = file.read(position - start).rfind(b"\n")
+            if index != -1:
+                file.truncate(start + index + 1)
+                return
+            position = start
+        file.truncate(0)
 
 
-def save_table_data(table_name, data):
+def apply_changes(data, changes):
     """
-    Сохраняет данные таблицы в JSON-файл.
+    Применяет записи журнала к данным таблицы.
+    
+    Поддерживаются записи вида {"op": "update", "ID": 1, "set": {...}},
+    {"op": "delete", "ID": 1} и {"op": "insert", "row": {...}}.
+    Повторное применение безопасно.
+    
+    Args:
+        data (list): Данные таблицы (изменяются на месте)
+        changes (list): Записи журнала
+        
+    Returns:
+        list: Данные таблицы с примененными изменениями
+    """
+    if not changes:
+        return data
+    
+    positions = {row["ID"]: i for i, row in enumerate(data)}
+    deleted = False
+    for change in changes:
+        if change["op"] == "insert":
+            row = dict(change["row"])
+            pos = positions.get(row["ID"])
+            if pos is None or data[pos] is None:
+                positions[row["ID"]] = len(data)
+                data.append(row)
+            else:
+                data[pos] = row
+            continue
+        
+        pos = positions.get(change.get("ID"))
+        if pos is None or data[pos] is None:
+            continue
+        if change["op"] == "update":
+            data[pos].update(change["set"])
+        elif change["op"] == "delete":
+            data[pos] = None
+            deleted = True
+    
+    if deleted:
+        data[:] = [row for row in data if row is not None]
+    return data
+
+
+def load_table_data(table_name, data_dir=DATA_DIR, where_clause=None):
+    """
+    Загружает данные таблицы из JSON-файла и применяет журнал изменений.
+    
+    Args:
+        table_name (str): Имя таблицы
+        data_dir (str): Директория с файлами данных (например, снимка)
+        where_clause (dict): Если передано, записи, не подходящие под
+            условие, могут быть пропущены (результат все равно нужно
+            отфильтровать)
+        
+    Returns:
+        list: Данные таблицы или пустой список, если файл не найден
+    """
+    if data_dir == DATA_DIR:
+        # Создаем директорию data, если она не существует
+        os.makedirs(DATA_DIR, exist_ok=True)
+        lock = storage_lock
+    else:
+        # Файлы снимков не изменяются, поэтому читаем их без блокировки
+        lock = nullcontext()
+    
+    filepath = _table_path(table_name, data_dir)
+    with lock:
+        try:
+            data = _read_table_file(filepath)
+        except FileNotFoundError:
+            data = []
+        except (json.JSONDecodeError, UnicodeDecodeError, zlib.error):
+            print(f"Ошибка: Файл {filepath} содержит некорректный JSON")
+            return []
+        
+        changes = _read_changes(table_name, data_dir)
+        if isinstance(data, dict) and data.get("format") == ENCODED_FORMAT:
+            # Записи, которые журнал обновляет, сохраняются: после
+            # применения журнала они могут подойти под условие. Вставка
+            # содержит запись целиком, и старая запись ей не нужна
+            changed_ids = {change["ID"] for change in changes if "ID" in change}
+            data = _decode_rows(data, where_clause, changed_ids)
+        return apply_changes(data, changes)
+
+
+def save_table_data(table_name, data, compress=False):
+    """
+    Полностью перезаписывает данные таблицы и очищает журнал изменений.
     
     Args:
         table_name (str): Имя таблицы
         data (list): Данные для сохранения
+        compress (bool): Сжать файл таблицы zlib
     """
-    # Создаем директорию data, если она не существует
-    os.makedirs("data", exist_ok=True)
+    filepath = _table_path(table_name)
+    
+    # Создаем директорию data (и директорию секций), если она не существует
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
     
-    filepath = f"data/{table_name}.json"
     try:
-        with open(filepath, 'w', encoding='utf-8') as file:
-            json.dump(data, file, ensure_ascii=False, indent=4)
+        with storage_lock:
+            _write_table_file(filepath, data, compress)
+            if os.path.exists(_delta_path(table_name)):
+                os.remove(_delta_path(table_name))
     except Exception as e:
-        print(f"Ошибка при сохранении файла {filepath}: {e}")
\ No newline at end of file
+        print(f"Ошибка при сохранении файла {filepath}: {e}")
+
+
+def append_table_changes(table_name, changes, compress=False):
+    """
+    Дописывает изменения в журнал таблицы без перезаписи основного файла.
+    
+    Когда журнал становится слишком большим, в фоне запускается компакция.
+    Ошибки записи (OSError) передаются вызывающему коду.
+    
+    Args:
+        table_name (str): Имя таблицы
+        changes (list): Записи журнала (см. apply_changes)
+        compress (bool): Сжимать файл таблицы при компакции
+    """
+    if not changes:
+        return
+    
+    delta_path = _delta_path(table_name)
+    os.makedirs(os.path.dirname(delta_path), exist_ok=True)
+    
+    # Ошибки записи не перехватываются: вызывающий код не должен
+    # менять данные и статистику, если изменения не попали на диск
+    with storage_lock:
+        _trim_torn_tail(delta_path)
+        # Двоичный режим: в текстовом режиме Windows заменила бы \n на \r\n
+        with open(delta_path, 'ab') as file:
+            for change in changes:
+                line = json.dumps(change, ensure_ascii=False) + "\n"
+                file.write(line.encode('utf-8'))
+            file.flush()
+            os.fsync(file.fileno())
+        
+        delta_size = os.path.getsize(delta_path)
+        base_size = (
+            os.path.getsize(_table_path(table_name))
+            if os.path.exists(_table_path(table_name))
+            else 0
+        )
+        need_compaction = (
+            delta_size > max(COMPACT_MIN_BYTES, base_size * COMPACT_RATIO)
+            and table_name not in _compacting
+        )
+        if need_compaction:
+            _compacting.add(table_name)
+    
+    if need_compaction:
+        threading.Thread(
+            target=compact_table_data,
+            args=(table_name, compress),
+            name=f"compact-{table_name}",
+        ).start()
+
+
+def compact_table_data(table_name, compress=False):
+    """
+    Сливает журнал изменений с основным файлом таблицы.
+    
+    Args:
+        table_name (str): Имя таблицы
+        compress (bool): Сжать файл таблицы zlib
+    """
+    try:
+        with storage_lock:
+            if os.path.exists(_delta_path(table_name)):
+                save_table_data(
+                    table_name, load_table_data(table_name), compress
+                )
+    finally:
+        _compacting.discard(table_name)
+
+
+def remove_table_data(table_name):
+    """
+    Удаляет файлы данных таблицы вместе с журналом изменений.
+    
+    Args:
+        table_name (str): Имя таблицы
+    """
+    with storage_lock:
+        for filepath in (_table_path(table_name), _delta_path(table_name)):
+            if os.path.exists(filepath):
+                os.remove(filepath)
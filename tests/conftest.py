@@ -0,0 +1,25 @@
+# tests/conftest.py
+import pytest
+
+from src.primitive_db import core
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Каждый тест работает в отдельной директории с пустым data/."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def metadata():
+    """Таблица, секционированная по значению department."""
+    metadata = core.create_table(
+        {},
+        "emp",
+        [("name", "str"), ("department", "str")],
+        {"column": "department", "method": "value"},
+    )
+    for name, department in (("a", "IT"), ("b", "HR"), ("c", "IT")):
+        core.insert(metadata, "emp", [name, department])
+    return metadata
@@ -0,0 +1,123 @@
+# tests/test_core.py
+from src.primitive_db import core
+from src.primitive_db.partitions import (
+    get_partition_spec,
+    load_table,
+    partition_key,
+)
+from src.primitive_db.planner import choose_access_path
+
+
+def _fail_append(*args, **kwargs):
+    raise OSError("disk full")
+
+
+def test_update_moves_row_with_long_partition_value(metadata):
+    department = "x" * 300
+    table_data = load_table(metadata, "emp")
+
+    core.update(metadata, "emp", table_data, {"department": department}, {"name": "a"})
+
+    assert load_table(metadata, "emp", {"department": department}) == [
+        {"ID": 1, "name": "a", "department": department}
+    ]
+    remaining = load_table(metadata, "emp", {"department": "IT"})
+    assert [row["name"] for row in remaining] == ["c"]
+
+
+def test_failed_update_keeps_row(metadata, monkeypatch):
+    table_data = load_table(metadata, "emp")
+    monkeypatch.setattr(core, "append_table_changes", _fail_append)
+
+    core.update(metadata, "emp", table_data, {"department": "QA"}, {"name": "a"})
+
+    assert table_data[0]["department"] == "IT"
+    assert load_table(metadata, "emp", {"department": "IT"})[0] == {
+        "ID": 1, "name": "a", "department": "IT"
+    }
+
+
+def test_failed_insert_keeps_last_id(metadata, monkeypatch):
+    monkeypatch.setattr(core, "append_table_changes", _fail_append)
+
+    core.insert(metadata, "emp", ["c", "IT"])
+
+    table_info = metadata["tables"]["emp"]
+    assert table_info["last_id"] == 3
+    assert table_info["stats"]["row_count"] == 3
+
+
+def test_failed_update_keeps_statistics(metadata, monkeypatch):
+    table_data = load_table(metadata, "emp")
+    monkeypatch.setattr(core, "append_table_changes", _fail_append)
+
+    core.update(metadata, "emp", table_data, {"name": "z"}, {"name": "a"})
+
+    plan = choose_access_path(metadata, "emp", {"name": "a"})
+    assert plan["path"] != "empty"
+
+
+def test_failed_delete_keeps_statistics(metadata, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda *args: "y")
+    table_data = load_table(metadata, "emp")
+    monkeypatch.setattr(core, "append_table_changes", _fail_append)
+    monkeypatch.setattr(core, "remove_table_data", _fail_append)
+
+    core.delete(metadata, "emp", table_data, {"name": "a"})
+
+    assert len(table_data) == 3
+    assert metadata["tables"]["emp"]["stats"]["row_count"] == 3
+
+
+def test_compress_option_stored_per_table():
+    metadata = core.create_table({}, "logs", [("msg", "str")], compress=True)
+    core.insert(metadata, "logs", ["hello"])
+
+    assert metadata["tables"]["logs"]["compress"] is True
+    with open("data/logs.json", "rb") as file:
+        assert file.read(1) == b"\x78"
+
+
+def test_partition_names_differ_regardless_of_case(metadata):
+    spec = get_partition_spec(metadata, "emp")
+
+    assert partition_key(spec, "IT").casefold() != partition_key(spec, "It").casefold()
+
+
+def test_delete_keeps_partition_with_other_case(metadata, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda *args: "y")
+    core.insert(metadata, "emp", ["d", "It"])
+    table_data = load_table(metadata, "emp", {"department": "IT"})
+
+    core.delete(metadata, "emp", table_data, {"department": "IT"})
+
+    assert load_table(metadata, "emp", {"department": "It"}) == [
+        {"ID": 4, "name": "d", "department": "It"}
+    ]
+
+
+def test_update_rejects_value_outside_range_partitions():
+    metadata = core.create_table(
+        {}, "t", [("name", "str"), ("age", "int")],
+        {"column": "age", "method": "range", "step": 10},
+    )
+    core.insert(metadata, "t", ["a", 25])
+    table_data = load_table(metadata, "t")
+
+    core.update(metadata, "t", table_data, {"age": "abc"}, {"name": "a"})
+
+    assert table_data[0]["age"] == 25
+    assert load_table(metadata, "t", {"age": 25}) == table_data
+
+
+def test_where_value_of_other_type_scans_partitions():
+    metadata = core.create_table(
+        {}, "t", [("name", "str"), ("active", "bool")],
+        {"column": "active", "method": "value"},
+    )
+    core.insert(metadata, "t", ["a", True])
+
+    assert choose_access_path(metadata, "t", {"active": 1})["path"] == "scan"
+    assert load_table(metadata, "t", {"active": 1}) == [
+        {"ID": 1, "name": "a", "active": True}
+    ]
@@ -0,0 +1,46 @@
+# tests/test_planner.py
+from src.primitive_db import partitions
+from src.primitive_db.planner import choose_access_path, load_table_for_query
+
+
+def _key(metadata, value):
+    spec = partitions.get_partition_spec(metadata, "emp")
+    return partitions.partition_key(spec, value)
+
+
+def test_partition_key_reads_one_partition(metadata):
+    plan = choose_access_path(metadata, "emp", {"department": "IT"})
+
+    assert plan["path"] == "partition"
+    assert plan["partitions"] == [_key(metadata, "IT")]
+    assert plan["estimated_rows"] == 2
+
+
+def test_other_column_scans_all_partitions(metadata):
+    plan = choose_access_path(metadata, "emp", {"name": "a"})
+
+    assert plan["path"] == "scan"
+    assert plan["partitions"] == [_key(metadata, "HR"), _key(metadata, "IT")]
+
+
+def test_missing_value_reads_nothing(metadata):
+    plan = choose_access_path(metadata, "emp", {"department": "QA"})
+
+    assert plan["path"] == "empty"
+    assert load_table_for_query(metadata, "emp", {"department": "QA"}) == []
+
+
+def test_partition_directory_listed_once(metadata, monkeypatch):
+    calls = []
+    listdir = partitions.os.listdir
+
+    def counting_listdir(path):
+        calls.append(path)
+        return listdir(path)
+
+    monkeypatch.setattr(partitions.os, "listdir", counting_listdir)
+
+    rows = load_table_for_query(metadata, "emp", {"department": "IT"})
+
+    assert [row["name"] for row in rows] == ["a", "c"]
+    assert len(calls) == 1
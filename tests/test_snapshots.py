@@ -0,0 +1,143 @@
+# tests/test_snapshots.py
+import os
+
+import pytest
+
+from src.primitive_db import core, snapshots
+from src.primitive_db.partitions import get_partition_spec, load_table, partition_key
+from src.primitive_db.utils import (
+    DELTA_SUFFIX,
+    compact_table_data,
+    load_metadata,
+    load_table_data,
+    save_metadata,
+)
+
+
+def _key(metadata, value):
+    return partition_key(get_partition_spec(metadata, "emp"), value)
+
+
+@pytest.mark.parametrize("name", ["", "a/b", "a\\b", ".hidden", "daily.tmp"])
+def test_invalid_names_rejected(name, workdir):
+    snapshots.create_snapshot({}, name)
+
+    assert not (workdir / "snapshots").exists()
+
+
+def test_snapshot_is_listed():
+    snapshots.create_snapshot({"tables": {}}, "daily")
+
+    assert snapshots.list_snapshots() == ["daily"]
+
+
+@pytest.mark.parametrize("failing_call", [2, 3])
+def test_interrupted_restore_is_finished(failing_call, monkeypatch):
+    monkeypatch.setattr("builtins.input", lambda *args: "y")
+    metadata = core.create_table({}, "t", [("name", "str")])
+    core.insert(metadata, "t", ["a"])
+    save_metadata("database.json", metadata)
+    snapshots.create_snapshot(metadata, "daily")
+    core.insert(metadata, "t", ["b"])
+    save_metadata("database.json", metadata)
+
+    # Сбой на переносе данных снимка (2) или его метаданных (3)
+    calls = []
+    replace = os.replace
+
+    def crashing_replace(src, dst):
+        calls.append(src)
+        if len(calls) == failing_call:
+            raise OSError("crash")
+        replace(src, dst)
+
+    monkeypatch.setattr(snapshots.os, "replace", crashing_replace)
+    snapshots.restore_snapshot(metadata, "daily")
+    monkeypatch.setattr(snapshots.os, "replace", replace)
+    assert os.path.exists(snapshots.OLD_DATA_DIR)
+
+    snapshots.recover_restore()
+
+    assert not os.path.exists(snapshots.OLD_DATA_DIR)
+    assert load_table_data("t") == [{"ID": 1, "name": "a"}]
+    assert load_metadata("database.json")["tables"]["t"]["stats"]["row_count"] == 1
+
+
+def test_journal_is_linked_and_read_up_to_snapshot(metadata):
+    snapshots.create_snapshot(metadata, "daily")
+    core.insert(metadata, "emp", ["d", "IT"])
+
+    journal = f"{snapshots.snapshot_data_dir('daily')}/emp/{_key(metadata, 'IT')}"
+    assert os.stat(f"{journal}{DELTA_SUFFIX}").st_nlink == 2
+    rows = load_table(metadata, "emp", data_dir=snapshots.snapshot_data_dir("daily"))
+    assert [row["name"] for row in rows] == ["a", "b", "c"]
+
+
+@pytest.fixture
+def database(metadata, monkeypatch):
+    """Таблица emp из общей фикстуры и несекционированная таблица t."""
+    monkeypatch.setattr("builtins.input", lambda *args: "y")
+    core.create_table(metadata, "t", [("name", "str")])
+    for name in ("a", "b"):
+        core.insert(metadata, "t", [name])
+    save_metadata("database.json", metadata)
+    return metadata
+
+
+def _change_everything(metadata):
+    core.insert(metadata, "t", ["x"])
+    core.update(metadata, "t", load_table(metadata, "t"), {"name": "y"}, {"ID": 1})
+    core.insert(metadata, "emp", ["x", "IT"])
+    emp = load_table(metadata, "emp")
+    core.update(metadata, "emp", emp, {"department": "QA"}, {"name": "a"})
+    compact_table_data("t")
+    compact_table_data(f"emp/{_key(metadata, 'IT')}")
+    save_metadata("database.json", metadata)
+
+
+def test_base_files_are_hardlinked(database):
+    snapshots.create_snapshot(database, "daily")
+
+    assert os.stat(f"{snapshots.snapshot_data_dir('daily')}/t.json").st_nlink == 2
+
+
+def test_snapshot_unchanged_after_later_writes(database):
+    expected = {name: load_table(database, name) for name in ("t", "emp")}
+    snapshots.create_snapshot(database, "daily")
+
+    _change_everything(database)
+    assert load_table(database, "emp") != expected["emp"]
+
+    data_dir = snapshots.snapshot_data_dir("daily")
+    for name, rows in expected.items():
+        assert load_table(database, name, data_dir=data_dir) == rows
+
+
+def test_restore_brings_back_data_and_metadata(database):
+    expected = {name: load_table(database, name) for name in ("t", "emp")}
+    snapshots.create_snapshot(database, "daily")
+    _change_everything(database)
+
+    restored = snapshots.restore_snapshot(database, "daily")
+
+    assert restored["tables"]["emp"]["last_id"] == 3
+    assert restored["tables"]["emp"]["stats"]["row_count"] == 3
+    assert load_metadata("database.json") == restored
+    for name, rows in expected.items():
+        assert load_table(restored, name) == rows
+
+
+def test_select_from_snapshot(database):
+    snapshots.create_snapshot(database, "daily")
+    _change_everything(database)
+
+    snapshot_metadata = snapshots.load_snapshot_metadata("daily")
+    rows = load_table(
+        snapshot_metadata,
+        "emp",
+        {"department": "IT"},
+        snapshots.snapshot_data_dir("daily"),
+        filter_rows=True,
+    )
+
+    assert [row["name"] for row in rows if row["department"] == "IT"] == ["a", "c"]
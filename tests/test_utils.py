@@ -0,0 +1,123 @@
+# tests/test_utils.py
+import json
+
+import pytest
+
+from src.primitive_db import utils
+
+
+def _rows():
+    return [
+        {"ID": 1, "name": "a", "department": "IT"},
+        {"ID": 2, "name": "b", "department": "HR"},
+    ]
+
+
+def test_changes_applied_on_load():
+    utils.save_table_data("t", _rows())
+    utils.append_table_changes("t", [
+        {"op": "update", "ID": 2, "set": {"name": "c"}},
+        {"op": "delete", "ID": 1},
+    ])
+
+    assert utils.load_table_data("t") == [{"ID": 2, "name": "c", "department": "HR"}]
+
+
+def test_torn_tail_is_ignored():
+    utils.save_table_data("t", _rows())
+    with open("data/t.delta.jsonl", "wb") as file:
+        file.write(b'{"op": "delete", "ID": 1}\n{"op": "upd')
+
+    assert utils.load_table_data("t") == _rows()[1:]
+
+
+def test_append_after_torn_tail_keeps_later_records():
+    utils.save_table_data("t", _rows())
+    with open("data/t.delta.jsonl", "wb") as file:
+        file.write(b'{"op": "upd')
+
+    utils.append_table_changes("t", [{"op": "delete", "ID": 1}])
+    utils.append_table_changes("t", [{"op": "update", "ID": 2, "set": {"name": "c"}}])
+
+    assert utils.load_table_data("t") == [{"ID": 2, "name": "c", "department": "HR"}]
+    with open("data/t.delta.jsonl", "rb") as file:
+        assert file.read().count(b"\n") == 2
+
+
+def test_corrupted_middle_line_raises():
+    utils.save_table_data("t", _rows())
+    with open("data/t.delta.jsonl", "wb") as file:
+        file.write(b'{"op": "upd\n{"op": "delete", "ID": 1}\n')
+
+    with pytest.raises(ValueError):
+        utils.load_table_data("t")
+
+
+def test_compressed_table_stays_compressed_after_compaction():
+    utils.save_table_data("t", _rows(), compress=True)
+    utils.append_table_changes("t", [{"op": "delete", "ID": 1}], compress=True)
+    utils.compact_table_data("t", compress=True)
+
+    with open("data/t.json", "rb") as file:
+        assert file.read(1) == b"\x78"
+    assert utils.load_table_data("t") == _rows()[1:]
+
+
+def _encoded_rows():
+    departments = ["IT", "HR", "IT", "HR"]
+    return [
+        {"ID": i, "name": f"n{i}", "department": department}
+        for i, department in enumerate(departments, 1)
+    ]
+
+
+def test_code_filter_keeps_rows_changed_by_journal():
+    utils.save_table_data("t", _encoded_rows())
+    utils.append_table_changes("t", [
+        {"op": "update", "ID": 2, "set": {"department": "IT"}},
+        {"op": "update", "ID": 3, "set": {"name": "x"}},
+    ])
+
+    rows = utils.load_table_data("t", where_clause={"department": "IT"})
+
+    assert [row["ID"] for row in rows] == [1, 2, 3]
+    assert rows[1]["department"] == "IT"
+
+
+def test_encode_round_trip():
+    encoded = utils._encode_rows(_encoded_rows())
+
+    assert encoded["dictionaries"] == {"department": ["HR", "IT"]}
+    assert utils._decode_rows(encoded) == _encoded_rows()
+
+
+def test_rows_with_different_columns_stay_plain():
+    rows = [{"ID": 1, "name": "a"}, {"ID": 2, "name": "b", "extra": True}]
+
+    assert utils._encode_rows(rows) == rows
+    utils.save_table_data("t", rows)
+    assert utils.load_table_data("t") == rows
+
+
+def test_legacy_list_file_loads(workdir):
+    (workdir / "data").mkdir()
+    (workdir / "data" / "t.json").write_text(json.dumps(_rows()), encoding="utf-8")
+
+    assert utils.load_table_data("t") == _rows()
+
+
+@pytest.mark.parametrize(
+    "where_clause, expected_ids",
+    [
+        ({"department": "IT"}, [1, 3]),
+        ({"department": "QA"}, []),
+        ({"department": 1}, []),
+        ({"name": "n2"}, [1, 2, 3, 4]),
+    ],
+)
+def test_code_filter(where_clause, expected_ids):
+    encoded = utils._encode_rows(_encoded_rows())
+
+    rows = utils._decode_rows(encoded, where_clause)
+
+    assert [row["ID"] for row in rows] == expected_ids